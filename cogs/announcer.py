@@ -1,6 +1,7 @@
 import discord
 from discord import app_commands
 from discord.ext import commands
+from rest_budget import Priority
 
 class AnnouncementModal(discord.ui.Modal, title="Make an Announcement"):
     def __init__(self, channel: discord.TextChannel, color: discord.Color, image_url: str = None, ping: str = None):
@@ -38,13 +39,21 @@ class AnnouncementModal(discord.ui.Modal, title="Make an Announcement"):
         
         content = self.ping if self.ping else None
 
+        # The send may wait in the REST budget queue - defer so we don't miss the 3s interaction deadline
+        await interaction.response.defer(ephemeral=True)
+
         try:
-            await self.channel.send(content=content, embed=embed)
-            await interaction.response.send_message(f"Announcement sent to {self.channel.mention}!", ephemeral=True)
+            await interaction.client.rest_budget.run(
+                Priority.INTERACTIVE,
+                f"channel:{self.channel.id}",
+                lambda: self.channel.send(content=content, embed=embed),
+                guild_id=self.channel.guild.id
+            )
+            await interaction.followup.send(f"Announcement sent to {self.channel.mention}!", ephemeral=True)
         except discord.Forbidden:
-             await interaction.response.send_message(f"Failed to send! I do not have permission to speak in {self.channel.mention}.", ephemeral=True)
+             await interaction.followup.send(f"Failed to send! I do not have permission to speak in {self.channel.mention}.", ephemeral=True)
         except Exception as e:
-             await interaction.response.send_message(f"An error occurred: {str(e)}", ephemeral=True)
+             await interaction.followup.send(f"An error occurred: {str(e)}", ephemeral=True)
 
 class Announcer(commands.Cog):
     def __init__(self, bot):
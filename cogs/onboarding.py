@@ -6,12 +6,15 @@ Onboarding Cog - Welcomes new members based on which invite link they used.
 - Creator invite (https://discord.gg/ZFYV3vaHVf) -> Channel 1461062991536460123
 """
 
+import asyncio
 import discord
 from discord.ext import commands
 from datetime import datetime, timezone
 import json
 import os
+import time
 from discord import ui, app_commands
+from rest_budget import Priority
 
 DATA_FILE = "./data/welcome_config.json"
 
@@ -94,8 +97,15 @@ class WelcomeConfigView(ui.View):
         )
         
         if target_channel:
-            await target_channel.send(f"**[TEST MESSAGE]**\n{formatted_message}")
-            await interaction.response.send_message(f"✅ Test message sent to {target_channel.mention}!", ephemeral=True)
+            # The send may wait in the REST budget queue - defer so we don't miss the 3s interaction deadline
+            await interaction.response.defer(ephemeral=True)
+            await interaction.client.rest_budget.run(
+                Priority.INTERACTIVE,
+                f"channel:{target_channel.id}",
+                lambda: target_channel.send(f"**[TEST MESSAGE]**\n{formatted_message}"),
+                guild_id=interaction.guild.id
+            )
+            await interaction.followup.send(f"✅ Test message sent to {target_channel.mention}!", ephemeral=True)
         else:
             await interaction.response.send_message(f"❌ Could not find target channel (ID: {channel_id})", ephemeral=True)
 
@@ -128,6 +138,13 @@ class Onboarding(commands.Cog):
         }
     }
 
+    # Invite snapshots older than this are refetched before they're trusted again.
+    # Invite events keep the set of codes current, but use counts only move when
+    # we fetch - joins we skip are tallied in unseen_joins until the next fetch.
+    INVITE_STALE_SECONDS = 600
+    # Joins arriving within this window share a single invite fetch
+    JOIN_BATCH_SECONDS = 2
+
     DEFAULT_MESSAGE = "Hi, {user}! Welcome to Honeylove's Official Discord! Please provide your Tiktok handle in this channel."
     
     def __init__(self, bot: commands.Bot):
@@ -136,6 +153,18 @@ class Onboarding(commands.Cog):
         self.load_config()
         # Cache of invites per guild: {guild_id: {invite_code: uses}}
         self.invite_cache = {}
+        # When each guild's invite snapshot was last fetched: {guild_id: time.monotonic()}
+        self.invite_fetched_at = {}
+        # Joins not yet reflected in the snapshot's use counts: {guild_id: count}
+        self.unseen_joins = {}
+        # Increments a fetch saw beyond its own batch (e.g. a join counted while the
+        # fetch was in flight), carried over to the next batch: {guild_id: {code: count}}
+        self.invite_surplus = {}
+        # Joins waiting for the current batch's invite fetch: {guild_id: [(member, role_matched)]}
+        self.pending_joins = {}
+        # REST usage counters, shown in /rest_stats
+        self.join_count = 0
+        self.invite_fetch_count = 0
         # Cooldown cache to prevent spamming welcomes if roles are toggled: {member_id: timestamp}
         self.welcome_cooldown = {}
 
@@ -182,24 +211,55 @@ class Onboarding(commands.Cog):
         view = WelcomeConfigView(self)
         await interaction.response.send_message("Please select a channel type to configure:", view=view, ephemeral=True)
     
+    async def fetch_invites(self, guild: discord.Guild):
+        """Fetch a guild's invites through the shared REST budget."""
+        self.invite_fetch_count += 1
+        return await self.bot.rest_budget.run(
+            Priority.ONBOARDING,
+            f"guild:{guild.id}:invites",
+            guild.invites,
+            guild_id=guild.id
+        )
+
     async def cache_invites(self, guild: discord.Guild):
         """Cache the current invite uses for a guild."""
         try:
-            invites = await guild.invites()
+            invites = await self.fetch_invites(guild)
             self.invite_cache[guild.id] = {invite.code: invite.uses for invite in invites}
+            self.invite_fetched_at[guild.id] = time.monotonic()
+            self.unseen_joins[guild.id] = 0
+            self.invite_surplus.pop(guild.id, None)
         except discord.Forbidden:
             print(f"Warning: Missing permissions to fetch invites for {guild.name}")
         except Exception as e:
             print(f"Error caching invites for {guild.name}: {e}")
+
+    def invites_fresh(self, guild_id: int) -> bool:
+        """Whether the guild's invite snapshot is recent enough to trust without refetching."""
+        fetched_at = self.invite_fetched_at.get(guild_id)
+        return fetched_at is not None and time.monotonic() - fetched_at < self.INVITE_STALE_SECONDS
     
     @commands.Cog.listener()
     async def on_ready(self):
-        """Cache invites for all guilds when bot starts."""
-        print("Onboarding cog loaded - caching invites...")
-        for guild in self.bot.guilds:
+        """Cache invites for guilds without a fresh snapshot (on_ready also fires on reconnect)."""
+        stale = [guild for guild in self.bot.guilds if not self.invites_fresh(guild.id)]
+        print(f"Onboarding cog loaded - caching invites for {len(stale)} guild(s)...")
+        for guild in stale:
             await self.cache_invites(guild)
         print(f"Cached invites for {len(self.invite_cache)} guild(s)")
     
+    @commands.Cog.listener()
+    async def on_leadership_change(self, is_leader: bool):
+        """Catch up on what the previous leader changed before taking over."""
+        if not is_leader:
+            return
+        # Welcome config may have been edited on the old leader, and our invite
+        # snapshots went stale while we were skipping joins as a follower
+        self.load_config()
+        for guild in self.bot.guilds:
+            await self.cache_invites(guild)
+        print(f"Took over onboarding - refreshed invites for {len(self.invite_cache)} guild(s)")
+    
     @commands.Cog.listener()
     async def on_invite_create(self, invite: discord.Invite):
         """Update cache when a new invite is created."""
@@ -215,6 +275,10 @@ class Onboarding(commands.Cog):
     
     async def send_welcome_message(self, member: discord.Member, config):
         """Helper to send the welcome message."""
+        # Only the leader replica welcomes members
+        if not self.bot.is_leader:
+            return
+
         channel_id = config.get("channel_id")
         
         # If channel_id is in the custom config, use it. Otherwise use the hardcoded default from INVITE_CONFIG/ROLE_CONFIG
@@ -225,6 +289,7 @@ class Onboarding(commands.Cog):
         # We need to overlay our custom config.
         
         # Determine the key to look up in welcome_config
+        role_label = config.get("role_type") or config.get("role_name", "Member")
         key = "Ambassador" if "Ambassador" in role_label else "Creator" if "Creator" in role_label else role_label
         # Fallback mapping
         if key not in ["Ambassador", "Creator"]:
@@ -254,10 +319,24 @@ class Onboarding(commands.Cog):
                 server=member.guild.name
             )
             
-            try:
+            async def send():
+                # Checked again when the send leaves the queue, not just when it was queued
+                if not self.bot.is_leader:
+                    print(f"Dropped welcome for {member} - no longer leader")
+                    return False
                 await channel.send(welcome_message)
-                print(f"Welcomed {role_label} {member} in #{channel.name}")
-                self.welcome_cooldown[member.id] = now
+                return True
+
+            try:
+                sent = await self.bot.rest_budget.run(
+                    Priority.ONBOARDING,
+                    f"channel:{channel.id}",
+                    send,
+                    guild_id=member.guild.id
+                )
+                if sent:
+                    print(f"Welcomed {role_label} {member} in #{channel.name}")
+                    self.welcome_cooldown[member.id] = now
             except Exception as e:
                  print(f"Error sending welcome to {channel.name}: {e}")
         else:
@@ -284,55 +363,92 @@ class Onboarding(commands.Cog):
         # Skip bots
         if member.bot:
             return
+
+        # Followers leave detection to the leader (and skip the invite fetch)
+        if not self.bot.is_leader:
+            return
         
-        # Check if member already has one of the roles
+        self.join_count += 1
+
+        # Roles already on the member come with the gateway join event - welcome by role
         role_matched = False
         for role in member.roles:
             if role.id in self.ROLE_CONFIG:
                 await self.send_welcome_message(member, self.ROLE_CONFIG[role.id])
                 role_matched = True
-        
-        # If we already matched a role, we might still want to track invites 
-        # but the cooldown in send_welcome_message will prevent double posting.
-        
-        used_invite_code = None
-        
+
+        # Coalesce bursts - the first join in a window fetches invites once for everyone
+        batch = self.pending_joins.setdefault(guild.id, [])
+        batch.append((member, role_matched))
+        if len(batch) > 1:
+            return
+        await asyncio.sleep(self.JOIN_BATCH_SECONDS)
+        await self.attribute_joins(guild, self.pending_joins.pop(guild.id, []))
+
+    async def attribute_joins(self, guild: discord.Guild, batch):
+        """Work out which invite a batch of joins used, fetching invites only when it can help."""
+        members = [member for member, role_matched in batch if not role_matched]
+        cached_invites = self.invite_cache.get(guild.id, {})
+
+        if self.invites_fresh(guild.id):
+            # Nothing to learn from a fetch if everyone was already welcomed by role, or if
+            # the guild has none of our tracked invites (invite events keep the codes current)
+            tracked_present = any(code in cached_invites for code in self.INVITE_CONFIG)
+            if not members or not tracked_present:
+                self.unseen_joins[guild.id] = self.unseen_joins.get(guild.id, 0) + len(batch)
+                for member in members:
+                    print(f"Member {member} joined via an untracked invite")
+                return
+
+        has_baseline = guild.id in self.invite_fetched_at
         try:
             # Get current invites and compare with cache
-            current_invites = await guild.invites()
+            current_invites = await self.fetch_invites(guild)
             current_invite_dict = {invite.code: invite.uses for invite in current_invites}
-            
-            # Find the invite whose use count increased
-            cached_invites = self.invite_cache.get(guild.id, {})
-            
-            for code, uses in current_invite_dict.items():
-                cached_uses = cached_invites.get(code, 0)
-                if uses > cached_uses:
-                    used_invite_code = code
-                    break
-            
-            # Update the cache
-            self.invite_cache[guild.id] = current_invite_dict
-            
         except discord.Forbidden:
             print(f"Warning: Missing permissions to fetch invites for {guild.name}")
             return
         except Exception as e:
-            print(f"Error detecting invite for {member}: {e}")
+            print(f"Error detecting invite for {len(batch)} member(s) in {guild.name}: {e}")
             return
-        
-        # Check if the invite matches our tracked invites
-        if used_invite_code and used_invite_code in self.INVITE_CONFIG:
-            config = self.INVITE_CONFIG[used_invite_code]
-            # Use the shared helper method which has cooldown logic
-            await self.send_welcome_message(member, config)
-        else:
-            # Log if member joined through unknown/other invite
-            if used_invite_code:
+
+        # Find the invites whose use count increased
+        increased = {}
+        for code, uses in current_invite_dict.items():
+            cached_uses = cached_invites.get(code, 0)
+            if uses > cached_uses:
+                increased[code] = uses - cached_uses
+        for code, count in self.invite_surplus.pop(guild.id, {}).items():
+            increased[code] = increased.get(code, 0) + count
+        expected = len(batch) + self.unseen_joins.get(guild.id, 0)
+
+        # Update the cache
+        self.invite_cache[guild.id] = current_invite_dict
+        self.invite_fetched_at[guild.id] = time.monotonic()
+        self.unseen_joins[guild.id] = 0
+
+        # Attribute only when one invite moved by at least as many joins as we're
+        # accounting for. If it moved by fewer, some joins didn't use an invite
+        # (vanity URL, Discovery) and we can't tell which - role detection covers those.
+        used_invite_code = None
+        if has_baseline and len(increased) == 1:
+            code, total = next(iter(increased.items()))
+            if total >= expected:
+                used_invite_code = code
+                if total > expected:
+                    self.invite_surplus[guild.id] = {code: total - expected}
+
+        for member in members:
+            # Check if the invite matches our tracked invites
+            if used_invite_code in self.INVITE_CONFIG:
+                config = self.INVITE_CONFIG[used_invite_code]
+                # Use the shared helper method which has cooldown logic
+                await self.send_welcome_message(member, config)
+            elif used_invite_code:
+                # Log if member joined through unknown/other invite
                 print(f"Member {member} joined via invite: {used_invite_code} (not tracked)")
             else:
                 print(f"Member {member} joined but invite could not be detected")
 
-
 async def setup(bot: commands.Bot):
     await bot.add_cog(Onboarding(bot))
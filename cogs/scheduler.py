@@ -1,3 +1,4 @@
+import asyncio
 import discord
 from discord import app_commands
 from discord.ext import commands, tasks
@@ -5,6 +6,7 @@ import json
 import os
 import time
 import uuid
+from rest_budget import Priority
 
 DATA_FILE = "data/schedules.json"
 
@@ -62,6 +64,8 @@ class Scheduler(commands.Cog):
         self.bot = bot
         self.schedules = []
         self.load_schedules()
+        # Whether the previous tick ran as leader (see announcement_loop)
+        self.leading = False
         self.announcement_loop.start()
 
     def load_schedules(self):
@@ -75,8 +79,11 @@ class Scheduler(commands.Cog):
 
     def save_schedules(self):
         try:
-            with open(DATA_FILE, 'w') as f:
+            # Write then rename so follower replicas never read a half-written file
+            tmp_file = DATA_FILE + ".tmp"
+            with open(tmp_file, 'w') as f:
                 json.dump(self.schedules, f, indent=4)
+            os.replace(tmp_file, DATA_FILE)
         except Exception as e:
             print(f"Failed to save schedules: {e}")
 
@@ -85,11 +92,24 @@ class Scheduler(commands.Cog):
 
     @tasks.loop(seconds=60)
     async def announcement_loop(self):
+        # Only the leader replica posts. Followers keep reloading from disk so
+        # they have the leader's latest next_run values when they take over.
+        if not self.bot.is_leader:
+            self.leading = False
+            self.load_schedules()
+            return
+        if not self.leading:
+            self.load_schedules()
+            self.leading = True
+
         now = time.time()
         
         # Iterate over a copy since we might modify
         # Actually we won't remove unless valid, but we update next_run
         
+        # Sends are queued on the shared REST budget together so one channel's
+        # rate limit doesn't hold up the rest of the fan-out
+        sends = []
         for schedule in self.schedules:
             if schedule['next_run'] <= now:
                 # Run it
@@ -103,11 +123,7 @@ class Scheduler(commands.Cog):
                     if schedule.get('image_url'):
                         embed.set_image(url=schedule['image_url'])
                     
-                    try:
-                        ping_content = schedule.get('ping')
-                        await channel.send(content=ping_content, embed=embed)
-                    except Exception as e:
-                        print(f"Error sending schedule {schedule['id']}: {e}")
+                    sends.append(self.send_scheduled(schedule, channel, embed))
                 else:
                     print(f"Channel {schedule['channel_id']} not found.")
 
@@ -116,7 +132,31 @@ class Scheduler(commands.Cog):
                 # Safer: reset to now + interval
                 schedule['next_run'] = now + schedule['interval_seconds']
         
+        # Save next_run before sending - the fan-out can outlast the leader lease,
+        # and a new leader must not pick these schedules up again
         self.save_schedules()
+        if sends:
+            await asyncio.gather(*sends)
+
+    async def send_scheduled(self, schedule, channel, embed):
+        ping_content = schedule.get('ping')
+
+        async def send():
+            # Checked when the send leaves the queue, not when it was queued
+            if not self.bot.is_leader:
+                print(f"Dropped schedule {schedule['id']} - no longer leader")
+                return
+            await channel.send(content=ping_content, embed=embed)
+
+        try:
+            await self.bot.rest_budget.run(
+                Priority.SCHEDULED,
+                f"channel:{channel.id}",
+                send,
+                guild_id=channel.guild.id
+            )
+        except Exception as e:
+            print(f"Error sending schedule {schedule['id']}: {e}")
 
     @announcement_loop.before_loop
     async def before_loop(self):
@@ -0,0 +1,34 @@
+import discord
+from discord import app_commands
+from discord.ext import commands
+
+class Status(commands.Cog):
+    def __init__(self, bot):
+        self.bot = bot
+
+    @app_commands.command(name="rest_stats", description="Show REST queue-wait metrics per priority class")
+    @app_commands.checks.has_permissions(administrator=True)
+    async def rest_stats(self, interaction: discord.Interaction):
+        embed = discord.Embed(title="REST Budget", color=discord.Color.blue())
+        for name, stats in self.bot.rest_budget.stats().items():
+            embed.add_field(
+                name=name.capitalize(),
+                value=(
+                    f"Pending: {stats['pending']}\n"
+                    f"Sent: {stats['dispatched']}\n"
+                    f"Avg wait: {stats['avg_wait'] * 1000:.0f}ms\n"
+                    f"Max wait: {stats['max_wait'] * 1000:.0f}ms"
+                ),
+                inline=True
+            )
+        onboarding = self.bot.get_cog("Onboarding")
+        if onboarding:
+            embed.add_field(
+                name="Invite Tracking",
+                value=f"Invite fetches: {onboarding.invite_fetch_count}\nJoins: {onboarding.join_count}",
+                inline=False
+            )
+        await interaction.response.send_message(embed=embed, ephemeral=True)
+
+async def setup(bot):
+    await bot.add_cog(Status(bot))
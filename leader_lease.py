@@ -0,0 +1,126 @@
+# -*- coding: utf-8 -*-
+"""
+Leader Lease - Single-leader coordination between bot replicas on one machine.
+
+Replicas share a SQLite file holding one lease row per name. Whoever holds an
+unexpired lease is the leader and runs the scheduler and onboarding sends; the
+others stay connected as warm followers and take over once the lease expires
+(or immediately, if the leader shuts down cleanly and releases it).
+"""
+
+import asyncio
+import concurrent.futures
+import os
+import socket
+import sqlite3
+import time
+import uuid
+
+
+class LeaderLease:
+    """SQLite-backed lease. Check `is_leader` before doing leader-only work."""
+
+    def __init__(self, path: str, name: str = "honeylove", ttl: float = 6.0,
+                 renew_interval: float = 2.0, on_change=None):
+        self.path = path
+        self.name = name
+        self.ttl = ttl
+        self.renew_interval = renew_interval
+        self.on_change = on_change
+        self.holder = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        # Local deadline (monotonic) - we stop acting as leader once it passes,
+        # even if the renew loop is stuck, so two leaders never overlap
+        self._valid_until = 0.0
+        self._leader = False
+        # All lease I/O runs on this one thread, so a release always lands after
+        # any renewal that was still in flight
+        self._executor = concurrent.futures.ThreadPoolExecutor(max_workers=1, thread_name_prefix="leader-lease")
+        self._stopped = False
+        self._init_db()
+
+    @property
+    def is_leader(self) -> bool:
+        return self._leader and time.monotonic() < self._valid_until
+
+    def _connect(self):
+        return sqlite3.connect(self.path, timeout=self.ttl / 2, isolation_level=None)
+
+    def _init_db(self):
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        conn = self._connect()
+        try:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS lease ("
+                "name TEXT PRIMARY KEY, holder TEXT NOT NULL, expires_at REAL NOT NULL)"
+            )
+        finally:
+            conn.close()
+
+    def try_acquire(self) -> bool:
+        """Acquire or renew the lease. Returns True if we hold it afterwards."""
+        started = time.monotonic()
+        conn = self._connect()
+        try:
+            # BEGIN IMMEDIATE takes the write lock up front so check-and-set is atomic
+            conn.execute("BEGIN IMMEDIATE")
+            now = time.time()
+            row = conn.execute("SELECT holder, expires_at FROM lease WHERE name = ?", (self.name,)).fetchone()
+            if row is None or row[0] == self.holder or row[1] <= now:
+                conn.execute(
+                    "INSERT OR REPLACE INTO lease (name, holder, expires_at) VALUES (?, ?, ?)",
+                    (self.name, self.holder, now + self.ttl)
+                )
+                conn.execute("COMMIT")
+                self._valid_until = started + self.ttl
+                return True
+            conn.execute("COMMIT")
+            return False
+        except sqlite3.Error:
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+            raise
+        finally:
+            conn.close()
+
+    def release(self):
+        """Give up the lease (if we hold it) so a follower can take over right away."""
+        self._leader = False
+        conn = self._connect()
+        try:
+            conn.execute("DELETE FROM lease WHERE name = ? AND holder = ?", (self.name, self.holder))
+        finally:
+            conn.close()
+
+    async def run(self):
+        """Keep trying to acquire/renew the lease until cancelled."""
+        loop = asyncio.get_running_loop()
+        while True:
+            try:
+                acquired = await loop.run_in_executor(self._executor, self.try_acquire)
+            except sqlite3.Error as e:
+                # One failed renewal (e.g. a busy timeout) isn't lost leadership -
+                # we only step down once our local deadline has passed
+                print(f"Error renewing leader lease: {e}")
+                acquired = self._leader and time.monotonic() < self._valid_until
+
+            if acquired != self._leader:
+                self._leader = acquired
+                print(f"Leader lease {'acquired' if acquired else 'lost'} ({self.holder})")
+                if self.on_change:
+                    self.on_change(acquired)
+
+            await asyncio.sleep(self.renew_interval)
+
+    async def stop(self):
+        """Release the lease on the lease thread (after any in-flight renewal) and shut it down."""
+        # discord.py may call close() more than once
+        if self._stopped:
+            return
+        self._stopped = True
+        loop = asyncio.get_running_loop()
+        try:
+            await loop.run_in_executor(self._executor, self.release)
+        finally:
+            self._executor.shutdown(wait=False)
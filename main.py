@@ -1,11 +1,14 @@
 # -*- coding: utf-8 -*-
 print("Starting bot script...")
 import discord
+from discord import app_commands
 from discord.ext import commands
 import os
 from dotenv import load_dotenv
 import asyncio
 from datetime import datetime, timezone
+from rest_budget import RestBudget, Priority
+from leader_lease import LeaderLease
 
 # Load environment variables
 print("Loading environment variables...")
@@ -14,6 +17,8 @@ TOKEN = os.getenv('DISCORD_TOKEN')
 APP_ID = os.getenv('APP_ID')
 print(f"Token present: {bool(TOKEN)}")
 print(f"App ID present: {bool(APP_ID)}")
+# Shared lease file used to elect a single leader when running several replicas
+LEASE_PATH = os.getenv('LEASE_PATH', './data/leader.db')
 
 # Logs channel ID
 LOGS_CHANNEL_ID = 1452444862212214950
@@ -23,16 +28,40 @@ intents = discord.Intents.default()
 intents.members = True  # Required for on_member_join events - Re-enabled for role detection
 # intents.message_content = True
 
+class HoneyloveTree(app_commands.CommandTree):
+    async def interaction_check(self, interaction: discord.Interaction) -> bool:
+        # Every replica receives every interaction - only the leader answers
+        return self.client.is_leader
+
 class HoneyloveBot(commands.Bot):
     def __init__(self):
         super().__init__(
             command_prefix='!',
             intents=intents,
             application_id=APP_ID,
-            help_command=None
+            help_command=None,
+            tree_cls=HoneyloveTree
         )
+        # Shared REST scheduler - every cog routes its Discord REST calls through this
+        self.rest_budget = RestBudget()
+        # Leader election - only the leader runs schedules and onboarding sends,
+        # followers stay connected with caches/config loaded, ready to take over
+        self.lease = LeaderLease(LEASE_PATH, on_change=self.on_lease_change)
+        self.lease_task = None
+        # Command sync and startup log run once, the first time this process becomes leader
+        self.leader_startup_done = False
+
+    @property
+    def is_leader(self) -> bool:
+        return self.lease.is_leader
+
+    def on_lease_change(self, is_leader: bool):
+        # Cogs can listen for this with on_leadership_change(is_leader)
+        self.dispatch("leadership_change", is_leader)
 
     async def setup_hook(self):
+        self.lease_task = asyncio.create_task(self.lease.run())
+
         # Load cogs
         for filename in os.listdir('./cogs'):
             if filename.endswith('.py'):
@@ -44,13 +73,26 @@ class HoneyloveBot(commands.Bot):
     async def on_ready(self):
         print(f'Logged in as {self.user} (ID: {self.user.id})')
         print('------')
+
+    async def on_leadership_change(self, is_leader: bool):
+        # Runs on first acquisition rather than in on_ready - a restarted process
+        # usually starts as a follower until the old lease row expires
+        if not is_leader or self.leader_startup_done:
+            return
+        self.leader_startup_done = True
+        await self.wait_until_ready()
         
         # Force sync to all guilds for immediate update
         print("Syncing commands to guilds...")
         for guild in self.guilds:
             try:
                 self.tree.copy_global_to(guild=guild) # Optional: copies global commands to guild
-                await self.tree.sync(guild=guild)
+                await self.rest_budget.run(
+                    Priority.MAINTENANCE,
+                    f"guild:{guild.id}:commands",
+                    lambda: self.tree.sync(guild=guild),
+                    guild_id=guild.id
+                )
                 print(f"Synced commands to {guild.name}")
             except Exception as e:
                 print(f"Failed to sync to {guild.name}: {e}")
@@ -74,11 +116,25 @@ class HoneyloveBot(commands.Bot):
             embed.set_thumbnail(url=self.user.display_avatar.url if self.user.display_avatar else None)
             embed.set_footer(text="Startup Log")
             
-            await logs_channel.send(embed=embed)
+            await self.rest_budget.run(
+                Priority.MAINTENANCE,
+                f"channel:{logs_channel.id}",
+                lambda: logs_channel.send(embed=embed),
+                guild_id=logs_channel.guild.id
+            )
             print(f"Sent startup log to #{logs_channel.name}")
         else:
             print(f"Warning: Could not find logs channel with ID {LOGS_CHANNEL_ID}")
 
+    async def close(self):
+        if self.lease_task:
+            self.lease_task.cancel()
+        try:
+            await self.lease.stop()
+        except Exception as e:
+            print(f"Error releasing leader lease: {e}")
+        await self.rest_budget.close()
+        await super().close()
 
 
 
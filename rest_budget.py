@@ -0,0 +1,211 @@
+# -*- coding: utf-8 -*-
+"""
+REST Budget - Shared, prioritized scheduler for Discord REST calls.
+
+Every cog sends its REST work (welcome messages, invite fetches, scheduled
+announcements, command syncs, ...) through one RestBudget owned by the bot so
+that a large scheduled fan-out can't starve the interactive or onboarding paths.
+
+- Priority classes: INTERACTIVE > ONBOARDING > SCHEDULED > MAINTENANCE
+- Token bucket per route bucket (e.g. "channel:<id>") plus a global bucket
+- Round-robin across guilds inside each priority class
+- Queue-wait metrics per priority class (see stats())
+"""
+
+import asyncio
+import enum
+import time
+from collections import deque
+
+
+class Priority(enum.IntEnum):
+    """Priority classes, lowest value is served first."""
+    INTERACTIVE = 0
+    ONBOARDING = 1
+    SCHEDULED = 2
+    MAINTENANCE = 3
+
+
+class TokenBucket:
+    """Simple token bucket: `rate` tokens refilled evenly over `per` seconds."""
+
+    def __init__(self, rate: int, per: float, now: float):
+        self.capacity = rate
+        self.tokens = float(rate)
+        self.fill_rate = rate / per
+        self.updated = now
+
+    def _refill(self, now: float):
+        elapsed = now - self.updated
+        if elapsed > 0:
+            self.tokens = min(self.capacity, self.tokens + elapsed * self.fill_rate)
+            self.updated = now
+
+    def delay(self, now: float) -> float:
+        """Seconds until a token is available (0 if one is available now)."""
+        self._refill(now)
+        if self.tokens >= 1:
+            return 0.0
+        return (1 - self.tokens) / self.fill_rate
+
+    def consume(self, now: float):
+        self._refill(now)
+        self.tokens -= 1
+
+
+class _Request:
+    __slots__ = ("priority", "bucket", "guild_id", "factory", "future", "enqueued_at")
+
+    def __init__(self, priority, bucket, guild_id, factory, future, enqueued_at):
+        self.priority = priority
+        self.bucket = bucket
+        self.guild_id = guild_id
+        self.factory = factory
+        self.future = future
+        self.enqueued_at = enqueued_at
+
+
+class RestBudget:
+    """Central request scheduler shared by all cogs (available as `bot.rest_budget`)."""
+
+    def __init__(self, route_rate: int = 5, route_per: float = 5.0,
+                 global_rate: int = 50, global_per: float = 1.0, clock=time.monotonic):
+        self.route_rate = route_rate
+        self.route_per = route_per
+        self.clock = clock
+        self._global = TokenBucket(global_rate, global_per, clock())
+        self._buckets = {}
+        # Pending requests: {priority: {guild_id: deque[_Request]}}
+        self._queues = {p: {} for p in Priority}
+        # Round-robin order of guilds with pending requests: {priority: deque[guild_id]}
+        self._rotation = {p: deque() for p in Priority}
+        self._metrics = {p: {"dispatched": 0, "total_wait": 0.0, "max_wait": 0.0} for p in Priority}
+        self._wakeup = None
+        self._worker = None
+        self._running = set()
+
+    async def run(self, priority: Priority, bucket: str, factory, guild_id=None):
+        """
+        Queue `factory()` (a callable returning a coroutine) and wait for its result.
+
+        `bucket` identifies the Discord route bucket the request draws on, e.g.
+        f"channel:{channel.id}" for message sends or f"guild:{guild.id}:invites".
+        """
+        loop = asyncio.get_running_loop()
+        if self._worker is None or self._worker.done():
+            self._wakeup = asyncio.Event()
+            self._worker = loop.create_task(self._dispatch_loop())
+
+        request = _Request(Priority(priority), bucket, guild_id, factory, loop.create_future(), self.clock())
+        guild_queues = self._queues[request.priority]
+        if guild_id not in guild_queues:
+            guild_queues[guild_id] = deque()
+            self._rotation[request.priority].append(guild_id)
+        guild_queues[guild_id].append(request)
+        self._wakeup.set()
+
+        return await request.future
+
+    def _route_bucket(self, bucket: str) -> TokenBucket:
+        if bucket not in self._buckets:
+            self._buckets[bucket] = TokenBucket(self.route_rate, self.route_per, self.clock())
+        return self._buckets[bucket]
+
+    def _next_request(self, now: float):
+        """Pop the next dispatchable request, or return (None, seconds to wait)."""
+        global_delay = self._global.delay(now)
+        wait = None
+        for priority in Priority:
+            guild_queues = self._queues[priority]
+            rotation = self._rotation[priority]
+            for guild_id in list(rotation):
+                queue = guild_queues[guild_id]
+                for request in list(queue):
+                    if request.future.done():
+                        # Caller gave up (cancelled) before we got to it
+                        queue.remove(request)
+                        continue
+                    delay = max(global_delay, self._route_bucket(request.bucket).delay(now))
+                    if delay == 0:
+                        queue.remove(request)
+                        # Move this guild to the back of the line for fairness
+                        rotation.remove(guild_id)
+                        if queue:
+                            rotation.append(guild_id)
+                        else:
+                            del guild_queues[guild_id]
+                        return request, None
+                    wait = delay if wait is None else min(wait, delay)
+                if not queue and guild_id in guild_queues:
+                    rotation.remove(guild_id)
+                    del guild_queues[guild_id]
+        return None, wait
+
+    async def _dispatch_loop(self):
+        while True:
+            now = self.clock()
+            request, wait = self._next_request(now)
+            if request is None:
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=wait)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            self._global.consume(now)
+            self._route_bucket(request.bucket).consume(now)
+
+            waited = now - request.enqueued_at
+            metrics = self._metrics[request.priority]
+            metrics["dispatched"] += 1
+            metrics["total_wait"] += waited
+            metrics["max_wait"] = max(metrics["max_wait"], waited)
+
+            task = asyncio.get_running_loop().create_task(self._execute(request))
+            self._running.add(task)
+            task.add_done_callback(self._running.discard)
+
+    async def _execute(self, request: _Request):
+        try:
+            result = await request.factory()
+        except asyncio.CancelledError:
+            request.future.cancel()
+            raise
+        except Exception as e:
+            if not request.future.done():
+                request.future.set_exception(e)
+        else:
+            if not request.future.done():
+                request.future.set_result(result)
+
+    def stats(self) -> dict:
+        """Queue-wait metrics per priority class."""
+        stats = {}
+        for priority in Priority:
+            metrics = self._metrics[priority]
+            dispatched = metrics["dispatched"]
+            stats[priority.name.lower()] = {
+                "pending": sum(len(q) for q in self._queues[priority].values()),
+                "dispatched": dispatched,
+                "avg_wait": metrics["total_wait"] / dispatched if dispatched else 0.0,
+                "max_wait": metrics["max_wait"],
+            }
+        return stats
+
+    async def close(self):
+        """Stop the dispatcher and cancel anything still queued."""
+        if self._worker is not None:
+            self._worker.cancel()
+            try:
+                await self._worker
+            except asyncio.CancelledError:
+                pass
+            self._worker = None
+        for priority in Priority:
+            for queue in self._queues[priority].values():
+                for request in queue:
+                    if not request.future.done():
+                        request.future.cancel()
+            self._queues[priority].clear()
+            self._rotation[priority].clear()
@@ -0,0 +1,154 @@
+import asyncio
+import multiprocessing
+import os
+import signal
+import sqlite3
+import tempfile
+import time
+import unittest
+
+from leader_lease import LeaderLease
+
+TTL = 1.0
+RENEW_INTERVAL = 0.25
+# Allowance for process scheduling and the replicas' 10ms status sampling
+SLACK = 0.25
+
+
+def run_replica(path, leader_flag, stop_event):
+    """Replica process: run the lease and publish is_leader until told to stop."""
+    async def main():
+        lease = LeaderLease(path, ttl=TTL, renew_interval=RENEW_INTERVAL)
+        task = asyncio.create_task(lease.run())
+        while not stop_event.is_set():
+            leader_flag.value = lease.is_leader
+            await asyncio.sleep(0.01)
+        leader_flag.value = False
+        task.cancel()
+        await lease.stop()
+
+    asyncio.run(main())
+
+
+class LeaderLeaseTests(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "leader.db")
+        self.changes = []
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def make_lease(self, **kwargs):
+        return LeaderLease(self.path, on_change=self.changes.append, **kwargs)
+
+    async def test_only_one_holder(self):
+        first, second = self.make_lease(), self.make_lease()
+        self.assertTrue(first.try_acquire())
+        self.assertFalse(second.try_acquire())
+        # Renewing our own lease still works
+        self.assertTrue(first.try_acquire())
+
+    async def test_failed_renewal_keeps_leadership(self):
+        lease = self.make_lease(renew_interval=0.01)
+        real_try_acquire = lease.try_acquire
+        calls = []
+
+        def flaky_try_acquire():
+            calls.append(1)
+            if len(calls) == 2:
+                raise sqlite3.OperationalError("database is locked")
+            return real_try_acquire()
+
+        lease.try_acquire = flaky_try_acquire
+        task = asyncio.create_task(lease.run())
+        while len(calls) < 4:
+            await asyncio.sleep(0.01)
+        task.cancel()
+        await lease.stop()
+
+        # Acquired once, never flapped through False
+        self.assertEqual(self.changes, [True])
+
+    async def test_stop_releases_for_follower(self):
+        leader, follower = self.make_lease(), self.make_lease()
+        task = asyncio.create_task(leader.run())
+        while not leader.is_leader:
+            await asyncio.sleep(0.01)
+        task.cancel()
+        await leader.stop()
+
+        self.assertFalse(leader.is_leader)
+        self.assertTrue(follower.try_acquire())
+        await follower.stop()
+
+    async def test_stop_twice_is_a_no_op(self):
+        lease = self.make_lease()
+        self.assertTrue(lease.try_acquire())
+        await lease.stop()
+        await lease.stop()
+        self.assertFalse(lease.is_leader)
+
+
+
+class MultiProcessLeaseTests(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "leader.db")
+        self.ctx = multiprocessing.get_context("spawn")
+        self.replicas = []
+        for _ in range(3):
+            flag = self.ctx.Value("b", False)
+            stop = self.ctx.Event()
+            process = self.ctx.Process(target=run_replica, args=(self.path, flag, stop))
+            process.start()
+            self.replicas.append((process, flag, stop))
+
+    def tearDown(self):
+        for process, _, stop in self.replicas:
+            stop.set()
+        for process, _, _ in self.replicas:
+            process.join(5)
+            if process.is_alive():
+                process.kill()
+        self.tmp.cleanup()
+
+    def leaders(self):
+        return [i for i, (process, flag, _) in enumerate(self.replicas) if process.is_alive() and flag.value]
+
+    def wait_for_leader(self, exclude=None, timeout=10.0):
+        """Wait for a leader (other than `exclude`), checking there's never more than one."""
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            leaders = self.leaders()
+            self.assertLessEqual(len(leaders), 1)
+            if leaders and leaders[0] != exclude:
+                return leaders[0]
+            time.sleep(0.005)
+        self.fail("no leader elected")
+
+    def test_single_leader_and_failover(self):
+        leader = self.wait_for_leader(timeout=30.0)
+
+        # Exactly one leader while things are steady
+        end = time.monotonic() + 1.0
+        while time.monotonic() < end:
+            self.assertEqual(self.leaders(), [leader])
+            time.sleep(0.01)
+
+        # Crash: a follower takes over once the lease expires
+        killed_at = time.monotonic()
+        os.kill(self.replicas[leader][0].pid, signal.SIGKILL)
+        self.replicas[leader][0].join()
+        leader = self.wait_for_leader(exclude=leader)
+        self.assertLess(time.monotonic() - killed_at, TTL + RENEW_INTERVAL + SLACK)
+
+        # Clean shutdown: the lease is released, so takeover is one renew interval away
+        stopped_at = time.monotonic()
+        self.replicas[leader][2].set()
+        leader = self.wait_for_leader(exclude=leader)
+        self.assertLess(time.monotonic() - stopped_at, RENEW_INTERVAL + SLACK)
+
+
+if __name__ == '__main__':
+    unittest.main()
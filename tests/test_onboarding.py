@@ -0,0 +1,240 @@
+"""
+Simulated join streams against a fake guild, counting invite REST fetches per join.
+
+For reference, the original cog fetched every invite once per join, plus once
+per guild on every on_ready (including reconnects) - 1.00 fetches per join.
+"""
+
+import asyncio
+import types
+import unittest
+
+from cogs.onboarding import Onboarding
+from rest_budget import RestBudget
+
+AMBASSADOR = "EA6jRfvFQv"
+CREATOR = "ZFYV3vaHVf"
+AMBASSADOR_CHANNEL = 1461061865449984105
+CREATOR_CHANNEL = 1461062991536460123
+
+# Batch window used in these tests; joins further apart than this are "isolated"
+BATCH_SECONDS = 0.02
+ISOLATED_GAP = 0.05
+
+
+class FakeInvite:
+    def __init__(self, code, uses):
+        self.code = code
+        self.uses = uses
+
+
+class FakeChannel:
+    def __init__(self, guild, channel_id):
+        self.guild = guild
+        self.id = channel_id
+        self.name = str(channel_id)
+
+    async def send(self, message):
+        self.guild.welcomes.append((self.id, message))
+
+
+class FakeGuild:
+    """Fake guild and REST layer - counts invite fetches and records welcome sends."""
+
+    def __init__(self, uses):
+        self.id = 1
+        self.name = "Honeylove"
+        self.uses = dict(uses)
+        self.fetches = 0
+        self.welcomes = []
+        # Called while a fetch is in flight, to simulate joins that land mid-fetch
+        self.during_fetch = None
+
+    async def invites(self):
+        self.fetches += 1
+        if self.during_fetch:
+            hook, self.during_fetch = self.during_fetch, None
+            hook()
+        await asyncio.sleep(0)
+        return [FakeInvite(code, uses) for code, uses in self.uses.items()]
+
+    def get_channel(self, channel_id):
+        return FakeChannel(self, channel_id)
+
+
+class FakeMember:
+    bot = False
+
+    def __init__(self, guild, member_id, roles=()):
+        self.guild = guild
+        self.id = member_id
+        self.name = f"member{member_id}"
+        self.mention = f"<@{member_id}>"
+        self.roles = list(roles)
+
+    def __str__(self):
+        return self.name
+
+
+class JoinStreamTests(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.guild = FakeGuild({AMBASSADOR: 10, CREATOR: 5, "other": 3})
+        self.bot = types.SimpleNamespace(
+            guilds=[self.guild],
+            rest_budget=RestBudget(route_rate=1000, global_rate=1000),
+            is_leader=True
+        )
+        self.cog = Onboarding(self.bot)
+        self.cog.JOIN_BATCH_SECONDS = BATCH_SECONDS
+        self.next_id = 0
+        self.tasks = []
+
+    async def asyncTearDown(self):
+        await self.bot.rest_budget.close()
+
+    def join(self, code=None, roles=()):
+        """A member joins via `code` (None for vanity/Discovery joins)."""
+        self.next_id += 1
+        if code:
+            self.guild.uses[code] = self.guild.uses.get(code, 0) + 1
+        member = FakeMember(self.guild, self.next_id, roles)
+        self.tasks.append(asyncio.create_task(self.cog.on_member_join(member)))
+        return member
+
+    async def drain(self):
+        await asyncio.gather(*self.tasks)
+        self.tasks = []
+
+    def welcomed_channels(self):
+        return [channel_id for channel_id, _ in self.guild.welcomes]
+
+    def join_fetches(self, before):
+        return (self.guild.fetches - before) / self.cog.join_count
+
+    async def test_reconnect_reuses_fresh_snapshot(self):
+        await self.cog.on_ready()
+        await self.cog.on_ready()
+        self.assertEqual(self.guild.fetches, 1)
+
+    async def test_isolated_joins_fetch_once_each(self):
+        # The realistic case for the Honeylove guild: joins spread out, no roles yet
+        await self.cog.on_ready()
+        before = self.guild.fetches
+        for i in range(10):
+            self.join(AMBASSADOR if i % 2 else CREATOR)
+            await asyncio.sleep(ISOLATED_GAP)
+        await self.drain()
+
+        self.assertEqual(self.join_fetches(before), 1.0)
+        self.assertEqual(self.welcomed_channels(), [CREATOR_CHANNEL, AMBASSADOR_CHANNEL] * 5)
+
+    async def test_burst_shares_one_fetch(self):
+        await self.cog.on_ready()
+        before = self.guild.fetches
+        for _ in range(8):
+            self.join(AMBASSADOR)
+        await self.drain()
+
+        self.assertEqual(self.guild.fetches - before, 1)
+        self.assertEqual(self.welcomed_channels(), [AMBASSADOR_CHANNEL] * 8)
+
+    async def test_join_counted_mid_fetch_is_carried_over(self):
+        await self.cog.on_ready()
+        self.join(CREATOR)
+        # The second join is counted by Discord while the first batch's fetch is in flight
+        self.guild.during_fetch = lambda: self.guild.uses.update({CREATOR: self.guild.uses[CREATOR] + 1})
+        await asyncio.sleep(BATCH_SECONDS / 2)
+        await self.drain()
+        self.tasks.append(asyncio.create_task(self.cog.on_member_join(FakeMember(self.guild, 99))))
+        await self.drain()
+
+        self.assertEqual(self.welcomed_channels(), [CREATOR_CHANNEL, CREATOR_CHANNEL])
+
+    async def test_vanity_join_in_window_is_not_guessed(self):
+        await self.cog.on_ready()
+        self.join(AMBASSADOR)
+        self.join(None)
+        await self.drain()
+
+        # One invite use for two joins - can't tell which member used it
+        self.assertEqual(self.guild.welcomes, [])
+
+    async def test_vanity_join_in_later_window_is_not_welcomed(self):
+        await self.cog.on_ready()
+        self.join(AMBASSADOR)
+        await self.drain()
+        self.join(None)
+        await self.drain()
+
+        # Exactly one welcome, for member1 - the vanity joiner moved no invite
+        self.assertEqual(self.welcomed_channels(), [AMBASSADOR_CHANNEL])
+        self.assertIn("<@1>", self.guild.welcomes[0][1])
+
+    async def test_vanity_join_after_skipped_role_join_is_not_welcomed(self):
+        await self.cog.on_ready()
+        # Already has the Ambassador role at join - welcomed by role, invite fetch skipped
+        ambassador_role = types.SimpleNamespace(id=next(iter(Onboarding.ROLE_CONFIG)))
+        self.join(AMBASSADOR, roles=[ambassador_role])
+        await self.drain()
+        fetches = self.guild.fetches
+        self.join(None)
+        await self.drain()
+
+        self.assertEqual(self.guild.fetches, fetches + 1)
+        # Only the role welcome for member1 - the vanity joiner isn't credited with member1's invite use
+        self.assertEqual(len(self.guild.welcomes), 1)
+        self.assertIn("<@1>", self.guild.welcomes[0][1])
+
+    async def test_welcome_dropped_if_leadership_lost_while_queued(self):
+        await self.cog.on_ready()
+        queue_run = self.bot.rest_budget.run
+
+        async def lose_lease_while_queued(priority, bucket, factory, guild_id=None):
+            # The lease expires after the welcome is queued but before it's dispatched
+            if bucket.startswith("channel:"):
+                self.bot.is_leader = False
+            return await queue_run(priority, bucket, factory, guild_id=guild_id)
+
+        self.bot.rest_budget.run = lose_lease_while_queued
+        self.join(AMBASSADOR)
+        await self.drain()
+
+        self.assertEqual(self.guild.welcomes, [])
+        self.assertNotIn(1, self.cog.welcome_cooldown)
+
+    async def test_mixed_codes_in_one_window_are_not_guessed(self):
+        await self.cog.on_ready()
+        self.join(AMBASSADOR)
+        self.join(CREATOR)
+        await self.drain()
+
+        self.assertEqual(self.guild.welcomes, [])
+
+    async def test_guild_without_tracked_invites_skips_fetch(self):
+        self.guild.uses = {"other": 3, "another": 0}
+        await self.cog.on_ready()
+        before = self.guild.fetches
+        for _ in range(5):
+            self.join("other")
+            await asyncio.sleep(ISOLATED_GAP)
+        await self.drain()
+
+        self.assertEqual(self.join_fetches(before), 0.0)
+
+    async def test_mixed_stream_ratio(self):
+        # Mostly isolated joins with a couple of bursts (e.g. after a creator posts the link)
+        await self.cog.on_ready()
+        before = self.guild.fetches
+        for wave in [1, 1, 1, 5, 1, 1, 1, 1, 8, 1]:
+            for _ in range(wave):
+                self.join(AMBASSADOR)
+            await asyncio.sleep(ISOLATED_GAP)
+        await self.drain()
+
+        # 10 fetches for 21 joins - the savings all come from the two bursts
+        self.assertEqual(self.guild.fetches - before, 10)
+        self.assertEqual(len(self.guild.welcomes), 21)
+
+
+if __name__ == '__main__':
+    unittest.main()
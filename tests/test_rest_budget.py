@@ -0,0 +1,171 @@
+import asyncio
+import unittest
+
+from rest_budget import RestBudget, Priority
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class FakeRest:
+    """Stands in for Discord's REST layer - records the order calls went out."""
+
+    def __init__(self):
+        self.calls = []
+
+    def call(self, tag):
+        async def request():
+            self.calls.append(tag)
+            return tag
+        return request
+
+    def fail(self, error):
+        async def request():
+            raise error
+        return request
+
+
+class RestBudgetTests(unittest.IsolatedAsyncioTestCase):
+    def make_budget(self, **kwargs):
+        self.clock = FakeClock()
+        self.rest = FakeRest()
+        self.budget = RestBudget(clock=self.clock, **kwargs)
+        return self.budget
+
+    async def asyncTearDown(self):
+        await self.budget.close()
+
+    async def settle(self):
+        for _ in range(20):
+            await asyncio.sleep(0)
+
+    async def advance(self, seconds):
+        """Move the fake clock forward and let the dispatcher catch up."""
+        self.clock.now += seconds
+        self.budget._wakeup.set()
+        await self.settle()
+
+    def submit(self, priority, bucket, tag, guild_id=None):
+        return asyncio.create_task(self.budget.run(priority, bucket, self.rest.call(tag), guild_id=guild_id))
+
+    async def test_priority_order(self):
+        self.make_budget(global_rate=1, global_per=1.0)
+        self.submit(Priority.MAINTENANCE, "a", "first")
+        await self.settle()
+
+        # Global bucket is now empty, so these all queue up
+        self.submit(Priority.MAINTENANCE, "b", "maintenance")
+        self.submit(Priority.SCHEDULED, "c", "scheduled")
+        self.submit(Priority.ONBOARDING, "d", "onboarding")
+        self.submit(Priority.INTERACTIVE, "e", "interactive")
+        await self.settle()
+        self.assertEqual(self.rest.calls, ["first"])
+
+        for _ in range(4):
+            await self.advance(1.0)
+        self.assertEqual(self.rest.calls, ["first", "interactive", "onboarding", "scheduled", "maintenance"])
+
+    async def test_route_bucket_limit(self):
+        self.make_budget(route_rate=2, route_per=10.0)
+        for i in range(3):
+            self.submit(Priority.SCHEDULED, "channel:1", f"c1-{i}")
+        self.submit(Priority.SCHEDULED, "channel:2", "c2-0")
+        await self.settle()
+        # Third send to channel 1 waits, channel 2 isn't held up by it
+        self.assertEqual(self.rest.calls, ["c1-0", "c1-1", "c2-0"])
+
+        await self.advance(4.0)
+        self.assertEqual(len(self.rest.calls), 3)
+        await self.advance(1.0)
+        self.assertEqual(self.rest.calls[-1], "c1-2")
+
+    async def test_global_limit(self):
+        self.make_budget(global_rate=2, global_per=1.0)
+        for i in range(3):
+            self.submit(Priority.SCHEDULED, f"channel:{i}", f"c{i}")
+        await self.settle()
+        self.assertEqual(self.rest.calls, ["c0", "c1"])
+
+        await self.advance(0.5)
+        self.assertEqual(self.rest.calls, ["c0", "c1", "c2"])
+
+    async def test_round_robin_across_guilds(self):
+        self.make_budget(global_rate=1, global_per=1.0)
+        self.submit(Priority.SCHEDULED, "x", "first")
+        await self.settle()
+
+        # Guild 1 queues its whole fan-out before guild 2 queues anything
+        for i in range(3):
+            self.submit(Priority.SCHEDULED, f"channel:1{i}", f"g1-{i}", guild_id=1)
+        for i in range(3):
+            self.submit(Priority.SCHEDULED, f"channel:2{i}", f"g2-{i}", guild_id=2)
+        await self.settle()
+
+        for _ in range(6):
+            await self.advance(1.0)
+        self.assertEqual(self.rest.calls[1:], ["g1-0", "g2-0", "g1-1", "g2-1", "g1-2", "g2-2"])
+
+    async def test_cancelled_request_is_not_sent(self):
+        self.make_budget(global_rate=1, global_per=1.0)
+        self.submit(Priority.SCHEDULED, "x", "first")
+        await self.settle()
+
+        cancelled = self.submit(Priority.SCHEDULED, "y", "cancelled")
+        kept = self.submit(Priority.SCHEDULED, "z", "kept")
+        await self.settle()
+        cancelled.cancel()
+        await self.settle()
+
+        await self.advance(1.0)
+        self.assertEqual(await kept, "kept")
+        self.assertEqual(self.rest.calls, ["first", "kept"])
+        self.assertEqual(self.budget.stats()["scheduled"]["pending"], 0)
+
+    async def test_close_cancels_queued_requests(self):
+        self.make_budget(global_rate=1, global_per=1.0)
+        self.submit(Priority.SCHEDULED, "x", "first")
+        await self.settle()
+        queued = self.submit(Priority.SCHEDULED, "y", "queued")
+        await self.settle()
+
+        await self.budget.close()
+        with self.assertRaises(asyncio.CancelledError):
+            await queued
+        self.assertEqual(self.rest.calls, ["first"])
+
+    async def test_exception_propagates_to_caller(self):
+        self.make_budget()
+        with self.assertRaises(ValueError):
+            await self.budget.run(Priority.INTERACTIVE, "x", self.rest.fail(ValueError("boom")))
+        # The dispatcher keeps going after a failed request
+        self.assertEqual(await self.budget.run(Priority.INTERACTIVE, "x", self.rest.call("after")), "after")
+
+    async def test_stats_wait_metrics(self):
+        self.make_budget(global_rate=1, global_per=1.0)
+        self.submit(Priority.SCHEDULED, "x", "first")
+        await self.settle()
+        self.submit(Priority.SCHEDULED, "y", "second")
+        self.submit(Priority.ONBOARDING, "z", "welcome")
+        await self.settle()
+
+        stats = self.budget.stats()
+        self.assertEqual(stats["scheduled"]["pending"], 1)
+        self.assertEqual(stats["onboarding"]["pending"], 1)
+
+        await self.advance(1.0)
+        await self.advance(1.0)
+        stats = self.budget.stats()
+        self.assertEqual(stats["onboarding"], {"pending": 0, "dispatched": 1, "avg_wait": 1.0, "max_wait": 1.0})
+        self.assertEqual(stats["scheduled"]["dispatched"], 2)
+        self.assertEqual(stats["scheduled"]["max_wait"], 2.0)
+        self.assertEqual(stats["scheduled"]["avg_wait"], 1.0)
+        self.assertEqual(stats["interactive"]["dispatched"], 0)
+
+
+if __name__ == '__main__':
+    unittest.main()